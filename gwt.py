@@ -15,6 +15,7 @@ from gwtlib.api import (
     auto_detect_git_dir,
     branch_exists_locally,
     create_worktree_for_branch,
+    ensure_worktree_base,
     get_main_worktree_path,
     get_worktree_base,
     get_worktree_list,
@@ -29,6 +30,7 @@ __all__ = [
     "main",
     # Public API used by tests
     "get_worktree_base",
+    "ensure_worktree_base",
     "get_main_worktree_path",
     "is_path_current_worktree",
     "rel_display_path",
@@ -7,6 +7,7 @@ from gwtlib.parsing import (
     parse_worktree_porcelain,
 )
 from gwtlib.paths import (
+    ensure_worktree_base,
     get_main_worktree_path,
     get_worktree_base,
     is_path_current_worktree,
@@ -18,6 +19,7 @@ from gwtlib.worktrees import create_worktree_for_branch
 __all__ = [
     # paths
     "get_worktree_base",
+    "ensure_worktree_base",
     "get_main_worktree_path",
     "is_path_current_worktree",
     "rel_display_path",
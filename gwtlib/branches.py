@@ -1,12 +1,12 @@
 # gwtlib/branches.py
 from gwtlib.git_ops import run_git_command, run_git_quiet
+from gwtlib.parsing import _worktree_list_raw
 
 
 def get_main_branch_name(git_dir):
     """Extract the main branch name from git worktree list."""
     try:
-        result = run_git_command(["worktree", "list"], git_dir)
-        lines = result.stdout.splitlines()
+        lines = _worktree_list_raw(git_dir).splitlines()
         if lines:
             parts = lines[0].split()
             if len(parts) >= 3:
@@ -25,14 +25,60 @@ def branch_exists_locally(branch_name, git_dir):
         return False
 
 
-def find_remote_branch(branch_name, git_dir):
-    """Search for remote branches matching given name, preferring origin."""
-    run_git_command(["remote", "update"], git_dir)
+def resolve_branch_ref(branch_name, git_dir):
+    """Locate a branch locally and remotely with one for-each-ref scan.
+
+    Returns ("local", branch_name), ("remote", "<remote>/<branch>") with
+    origin preferred, or None. Collapses the separate rev-parse and
+    remote-ref probes into a single subprocess. Quiet, like the
+    rev-parse probe it replaces: the matched refs are an implementation
+    detail, not user output.
+    """
+    try:
+        result = run_git_quiet(
+            [
+                "for-each-ref",
+                "--format=%(refname:short)",
+                f"refs/heads/{branch_name}",
+                f"refs/remotes/*/{branch_name}",
+            ],
+            git_dir,
+        )
+    except Exception:
+        return None
+    refs = [r for r in result.stdout.strip().split("\n") if r]
+    if branch_name in refs:
+        return ("local", branch_name)
+    remote_refs = refs
+    if len(remote_refs) == 1:
+        return ("remote", remote_refs[0])
+    for ref in remote_refs:
+        if ref.startswith("origin/"):
+            return ("remote", ref)
+    if remote_refs:
+        return ("remote", remote_refs[0])
+    return None
+
+
+def _matching_remote_refs(branch_name, git_dir):
     result = run_git_command(
         ["for-each-ref", "--format=%(refname:short)", f"refs/remotes/*/{branch_name}"],
         git_dir,
     )
-    refs = [r for r in result.stdout.strip().split("\n") if r]
+    return [r for r in result.stdout.strip().split("\n") if r]
+
+
+def find_remote_branch(branch_name, git_dir):
+    """Search for remote branches matching given name, preferring origin.
+
+    The cheap local ref probe runs first; `git remote update` (a network
+    round-trip that can take seconds) only happens when nothing matched.
+    """
+    refs = _matching_remote_refs(branch_name, git_dir)
+    if not refs:
+        # Output isn't inspected; inherit stderr instead of buffering it
+        run_git_command(["remote", "update"], git_dir, stream_to_stderr=True)
+        refs = _matching_remote_refs(branch_name, git_dir)
     if len(refs) == 1:
         return refs[0]
     elif len(refs) > 1:
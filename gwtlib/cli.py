@@ -1,15 +1,171 @@
 # gwtlib/cli.py
-import argparse
 import os
 import sys
 
-from gwtlib.config import HAS_TOML, get_config_path, load_config, save_config
+from gwtlib.config import get_config_path, has_toml, load_config, save_config
 from gwtlib.display import list_all_branches, list_worktrees
-from gwtlib.resolution import get_git_dir, get_git_dir_with_source
+from gwtlib.resolution import (
+    _probe_repo_path,
+    get_git_dir,
+    get_git_dir_with_source,
+)
 from gwtlib.worktrees import remove_worktree, switch_branch
 
 
+def _cmd_switch(args, git_dir):
+    switch_branch(
+        args.branch_name,
+        git_dir,
+        create=getattr(args, "create", False),
+        force_create=getattr(args, "force_create", False),
+        guess=getattr(args, "guess", True),
+    )
+
+
+def _cmd_remove(args, git_dir):
+    remove_worktree(args.branch_name, git_dir)
+
+
+def _cmd_list(args, git_dir):
+    if getattr(args, "branches", None):
+        # Pass annotate flag down
+        annotate = getattr(args, "annotate", "none")
+        list_all_branches(
+            git_dir,
+            mode=args.branches,
+            annotate=annotate if annotate != "none" else None,
+        )
+    else:
+        list_worktrees(
+            git_dir,
+            branches_only=False,
+            raw=getattr(args, "raw", False),
+            verbose=getattr(args, "verbose", False),
+            no_warn=getattr(args, "no_warn", False),
+            show_status=getattr(args, "status", False),
+            color=getattr(args, "color", "auto"),
+            absolute=getattr(args, "absolute", False),
+        )
+
+
+_LIST_COMMANDS = frozenset({"list", "ls", "l"})
+
+
+def _die(*lines):
+    """Write error lines straight to fd 2 and exit 1.
+
+    One write syscall replaces a locked, flushed print per line; message
+    text is identical to what print would emit.
+    """
+    os.write(2, ("\n".join(lines) + "\n").encode())
+    raise SystemExit(1)
+
+
+def _print_default_repo():
+    """Print the configured default repo (used by shell completion)."""
+    if has_toml():
+        config = load_config()
+        if config.get("default_repo") and os.path.isdir(config["default_repo"]):
+            print(config["default_repo"])
+
+
+def _parse_branches_argv(rest):
+    """Minimal hand parse of `list --branches ...` completion arguments.
+
+    Returns (mode, annotate, git_dir) or None when anything unrecognized
+    appears; the caller then falls back to the full argparse tree.
+    """
+    mode = None
+    annotate = "none"
+    git_dir = None
+    i = 0
+    while i < len(rest):
+        tok = rest[i]
+        if tok == "--branches":
+            mode = "all"
+            if i + 1 < len(rest) and rest[i + 1] in ("all", "local", "worktrees"):
+                mode = rest[i + 1]
+                i += 1
+        elif tok.startswith("--branches="):
+            mode = tok[len("--branches=") :]
+            if mode not in ("all", "local", "worktrees"):
+                return None
+        elif tok == "--annotate" and i + 1 < len(rest):
+            annotate = rest[i + 1]
+            i += 1
+        elif tok.startswith("--annotate="):
+            annotate = tok[len("--annotate=") :]
+        elif tok == "--git-dir" and i + 1 < len(rest):
+            git_dir = rest[i + 1]
+            i += 1
+        elif tok.startswith("--git-dir="):
+            git_dir = tok[len("--git-dir=") :]
+        else:
+            return None
+        i += 1
+    if mode is None or annotate not in ("none", "bash", "fish"):
+        return None
+    return (mode, annotate, git_dir)
+
+
 def main():
+    # Completion hot paths bypass argparse entirely: building the full
+    # subparser tree is pure-Python work that dominates cold start for
+    # `get-repo` and `list --branches`. Anything this hand parse doesn't
+    # recognize falls through to the real parser below.
+    argv = sys.argv[1:]
+    if not argv or (argv[0] in _LIST_COMMANDS and len(argv) == 1):
+        # Bare `gwt` and plain `gwt list` with argparse defaults
+        git_dir, _, _ = get_git_dir_with_source()
+        if git_dir:
+            list_worktrees(git_dir)
+            return
+    if argv:
+        if argv[0] == "get-repo" and len(argv) == 1:
+            _print_default_repo()
+            return
+        if (
+            argv[0] in ("switch", "s")
+            and len(argv) == 2
+            and not argv[1].startswith("-")
+        ):
+            # Plain `gwt switch <branch>` with argparse defaults; any
+            # flag falls through to the full parser
+            git_dir, _, _ = get_git_dir_with_source()
+            if git_dir:
+                switch_branch(argv[1], git_dir)
+                return
+        if (
+            argv[0] in ("remove", "rm")
+            and len(argv) == 2
+            and not argv[1].startswith("-")
+        ):
+            git_dir, _, _ = get_git_dir_with_source()
+            if git_dir:
+                remove_worktree(argv[1], git_dir)
+                return
+        if argv[0] in _LIST_COMMANDS and any(
+            a == "--branches" or a.startswith("--branches=") for a in argv[1:]
+        ):
+            fast = _parse_branches_argv(argv[1:])
+            if fast is not None:
+                mode, annotate, explicit_arg = fast
+                git_dir, _, _ = get_git_dir_with_source(
+                    explicit_git_dir=explicit_arg
+                )
+                if git_dir:
+                    list_all_branches(
+                        git_dir,
+                        mode=mode,
+                        annotate=annotate if annotate != "none" else None,
+                    )
+                    return
+                # No resolvable git dir: fall through so the full parser
+                # path prints its usual diagnostics
+
+    # Deferred so the fast paths above never pay the argparse import
+    import argparse
+
     parser = argparse.ArgumentParser(description="Git worktree wrapper")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
@@ -44,6 +200,7 @@ def main():
         default=True,
         help="Guess remote branch names (default: enabled)",
     )
+    switch_parser.set_defaults(func=_cmd_switch)
 
     # Create a 'remove' subcommand with 'rm' as alias
     remove_parser = subparsers.add_parser(
@@ -52,6 +209,7 @@ def main():
     remove_parser.add_argument(
         "branch_name", help="Name of the branch worktree to remove"
     )
+    remove_parser.set_defaults(func=_cmd_remove)
 
     # Create a 'list' subcommand that's implicit if no command is provided
     list_parser = subparsers.add_parser(
@@ -98,6 +256,7 @@ def main():
         default="none",
         help="Annotate branch completion output for shells",
     )
+    list_parser.set_defaults(func=_cmd_list)
 
     # Special command to get the default repository from config
     _get_repo_parser = subparsers.add_parser(
@@ -110,17 +269,15 @@ def main():
     if args.command == "repo":
         if args.git_dir:
             # Auto-detect if we need to append .git for non-bare repos
-            git_dir = args.git_dir
-            if os.path.isdir(git_dir):
-                dot_git = os.path.join(git_dir, ".git")
-                if os.path.isdir(dot_git):
-                    git_dir = dot_git
+            # (shared two-stat probe; falls back to the raw argument when
+            # the path doesn't exist so the user sees what they typed)
+            git_dir = _probe_repo_path(args.git_dir) or args.git_dir
 
             # Set the git directory
             print(f"GWT_GIT_DIR={git_dir}")
 
             # Update the config if TOML is available
-            if HAS_TOML:
+            if has_toml():
                 config = load_config()
                 config["default_repo"] = git_dir
                 save_config(config)
@@ -139,22 +296,20 @@ def main():
                 print("No repo currently configured")
         return
     elif args.command == "get-repo":
-        # Special command to output the default repo from config
-        # This is used by the shell completion function
-        if HAS_TOML:
-            config = load_config()
-            if config.get("default_repo") and os.path.isdir(config["default_repo"]):
-                print(config["default_repo"])
+        # Normally handled by the fast path above; kept for invocations
+        # that reach the full parser (e.g. extra arguments)
+        _print_default_repo()
         return
 
     # If no command specified, default to list
     if args.command is None:
         args.command = "list"
+        args.func = _cmd_list
 
     # Resolve git dir with new function; explicit arg for list only
     if (
         hasattr(args, "git_dir")
-        and args.command in ["list", "ls", "l"]
+        and args.command in _LIST_COMMANDS
         and args.git_dir
     ):
         explicit_arg = args.git_dir
@@ -170,75 +325,28 @@ def main():
         # E003: config invalid
 
         if source == "env_invalid":
-            print(
+            _die(
                 f"Error [E002]: GWT_GIT_DIR points to an invalid git directory: {meta.get('env')}",
-                file=sys.stderr,
-            )
-            print(
                 "hint: Ensure it points to a valid bare repo or to /path/to/repo/.git",
-                file=sys.stderr,
-            )
-            print(
                 "hint: Set with: export GWT_GIT_DIR=/path/to/repo/.git or run: gwt repo /path/to/repo.git",
-                file=sys.stderr,
             )
-            sys.exit(1)
         if source == "config_invalid":
-            cfg_path = get_config_path()
-            print(
+            _die(
                 f"Error [E003]: default_repo in config is invalid: {meta.get('config')}",
-                file=sys.stderr,
-            )
-            print(
                 "hint: Update it by running: gwt repo /path/to/repo.git",
-                file=sys.stderr,
+                f"hint: Or edit config: {get_config_path()}",
             )
-            print(f"hint: Or edit config: {cfg_path}", file=sys.stderr)
-            sys.exit(1)
 
         # No detection, no env/config
-        print(
+        _die(
             "Error [E001]: No git repository detected here and no valid GWT_GIT_DIR or default_repo configured.",
-            file=sys.stderr,
+            "hint: cd into any git repo; or",
+            "hint: set GWT_GIT_DIR=/path/to/repo/.git; or",
+            "hint: run: gwt repo /path/to/repo.git",
         )
-        print("hint: cd into any git repo; or", file=sys.stderr)
-        print("hint: set GWT_GIT_DIR=/path/to/repo/.git; or", file=sys.stderr)
-        print("hint: run: gwt repo /path/to/repo.git", file=sys.stderr)
-        sys.exit(1)
     # Narrow type for static checkers
     assert git_dir is not None
 
-    # Now pass git_dir to all functions that need it
-    if args.command == "repo":
-        # Just print a message for the shell script to handle
-        print(f"GWT_GIT_DIR={args.git_dir}")
-    elif args.command in ["switch", "s"]:
-        switch_branch(
-            args.branch_name,
-            git_dir,
-            create=getattr(args, "create", False),
-            force_create=getattr(args, "force_create", False),
-            guess=getattr(args, "guess", True),
-        )
-    elif args.command in ["remove", "rm"]:
-        remove_worktree(args.branch_name, git_dir)
-    elif args.command in ["list", "ls", "l"]:
-        if hasattr(args, "branches") and args.branches:
-            # Pass annotate flag down
-            annotate = getattr(args, "annotate", "none")
-            list_all_branches(
-                git_dir,
-                mode=args.branches,
-                annotate=annotate if annotate != "none" else None,
-            )
-        else:
-            list_worktrees(
-                git_dir,
-                branches_only=False,
-                raw=getattr(args, "raw", False),
-                verbose=getattr(args, "verbose", False),
-                no_warn=getattr(args, "no_warn", False),
-                show_status=getattr(args, "status", False),
-                color=getattr(args, "color", "auto"),
-                absolute=getattr(args, "absolute", False),
-            )
+    # Dispatch to the handler the subparser registered; aliases are
+    # handled natively by argparse.
+    args.func(args, git_dir)
@@ -1,53 +1,86 @@
 # gwtlib/config.py
+import functools
 import os
 import sys
 from pathlib import Path
 
-# HAS_TOML determination (from gwt.py:18-35)
-try:
-    if sys.version_info >= (3, 11):
-        import tomllib as tomli  # type: ignore
-    else:
-        import tomli  # type: ignore
-    import tomli_w  # type: ignore
 
-    HAS_TOML = True
-except ImportError:
-    print(
-        "Warning: tomli/tomli_w packages not found. Configuration features will be disabled.",
-        file=sys.stderr,
-    )
-    print("Install with: pip install tomli tomli-w", file=sys.stderr)
-    HAS_TOML = False
+@functools.lru_cache(maxsize=1)
+def _get_toml():
+    """Import the TOML reader/writer on first use; returns (tomli, tomli_w) or None.
+
+    Deferred so commands that never touch the config file don't pay the
+    import cost at startup.
+    """
+    try:
+        if sys.version_info >= (3, 11):
+            import tomllib as tomli  # type: ignore
+        else:
+            import tomli  # type: ignore
+        import tomli_w  # type: ignore
+    except ImportError:
+        print(
+            "Warning: tomli/tomli_w packages not found. Configuration features will be disabled.",
+            file=sys.stderr,
+        )
+        print("Install with: pip install tomli tomli-w", file=sys.stderr)
+        return None
+    return (tomli, tomli_w)
+
+
+def has_toml():
+    """Whether TOML support is available (triggers the lazy import)."""
+    return _get_toml() is not None
 
 
+# Parsed config cached per-process, keyed on (mtime_ns, size) of the file so
+# repeated load_config() calls within one invocation skip re-parsing the TOML.
+_config_cache = None
+
+
+@functools.lru_cache(maxsize=1)
 def get_config_path():
-    """Get the path to the config file following XDG Base Directory spec."""
+    """Get the path to the config file following XDG Base Directory spec.
+
+    Cached: the XDG lookup and the ensure-directory mkdir only need to
+    happen once per process.
+    """
     xdg_config_home = os.environ.get("XDG_CONFIG_HOME")
     if xdg_config_home:
         config_dir = Path(xdg_config_home) / "gwt"
     else:
         config_dir = Path.home() / ".config" / "gwt"
-    config_dir.mkdir(parents=True, exist_ok=True)
+    if not config_dir.is_dir():
+        config_dir.mkdir(parents=True, exist_ok=True)
     return config_dir / "config.toml"
 
 
 def load_config():
     """Load configuration from file with fallback to defaults."""
+    global _config_cache
     default_config = {"default_repo": None, "repos": {}}
-    if not HAS_TOML:
+    toml = _get_toml()
+    if toml is None:
         return default_config
+    tomli, tomli_w = toml
     config_path = get_config_path()
-    if not config_path.exists():
+    try:
+        st = os.stat(config_path)
+    except OSError:
         try:
             with open(config_path, "wb") as f:
-                tomli_w.dump(default_config, f)  # type: ignore
+                tomli_w.dump(default_config, f)
         except Exception as e:
             print(f"Error creating config file: {e}", file=sys.stderr)
         return default_config
+    cache_key = (st.st_mtime_ns, st.st_size)
+    if _config_cache is not None and _config_cache[0] == cache_key:
+        return _config_cache[1]
     try:
-        with open(config_path, "rb") as f:
-            config = tomli.load(f)  # type: ignore
+        # One read() into memory; parsing a contiguous buffer avoids the
+        # per-token reads tomli does through a file handle.
+        config = tomli.loads(config_path.read_bytes().decode("utf-8"))
+        _config_cache = (cache_key, config)
         return config
     except Exception as e:
         print(f"Error loading config file: {e}", file=sys.stderr)
@@ -56,24 +89,31 @@ def load_config():
 
 def save_config(config):
     """Save the configuration to the config file."""
-    if not HAS_TOML:
+    global _config_cache
+    toml = _get_toml()
+    if toml is None:
         return
+    _, tomli_w = toml
     config_path = get_config_path()
     try:
         with open(config_path, "wb") as f:
-            tomli_w.dump(config, f)  # type: ignore
+            tomli_w.dump(config, f)
+        # Keep the in-memory cache coherent so a follow-up load_config()
+        # doesn't have to re-read what we just wrote.
+        st = os.stat(config_path)
+        _config_cache = ((st.st_mtime_ns, st.st_size), config)
     except Exception as e:
         print(f"Error saving config file: {e}", file=sys.stderr)
 
 
 def get_repo_config(git_dir):
-    """Get repository-specific configuration, creating defaults if needed."""
+    """Get repository-specific configuration, falling back to defaults.
+
+    The default entry is not persisted: writing it back would re-serialize
+    the whole config on every invocation for repos the user never
+    customized, and the defaults are equivalent to the key being absent.
+    """
     config = load_config()
     if "repos" in config and git_dir in config["repos"]:
         return config["repos"][git_dir]
-    default_repo_config = {"post_create_commands": []}
-    if "repos" not in config:
-        config["repos"] = {}
-    config["repos"][git_dir] = default_repo_config
-    save_config(config)
-    return default_repo_config
+    return {"post_create_commands": []}
@@ -3,14 +3,16 @@ import os
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-from gwtlib.git_ops import run_git_command, run_git_in_worktree, run_git_quiet
+from gwtlib.git_ops import run_git_command_iter, run_git_in_worktree
 from gwtlib.parsing import (
+    _worktree_list_raw,
     get_worktree_list,
     parse_worktree_legacy,
     parse_worktree_porcelain,
 )
-from gwtlib.paths import is_path_current_worktree, rel_display_path
+from gwtlib.paths import get_main_worktree_path, get_worktree_base
 
 
 class ColorMode:
@@ -19,6 +21,26 @@ class ColorMode:
     NEVER = "never"
 
 
+_TERMINAL = None
+
+
+def _terminal():
+    """(columns, stderr_isatty, color_allowed), computed lazily once per process.
+
+    The terminal size and isatty ioctls plus the NO_COLOR lookup don't
+    change within an invocation, so every color-aware helper shares one
+    probe.
+    """
+    global _TERMINAL
+    if _TERMINAL is None:
+        _TERMINAL = (
+            shutil.get_terminal_size(fallback=(80, 24)).columns,
+            sys.stderr.isatty(),
+            os.environ.get("NO_COLOR") is None,
+        )
+    return _TERMINAL
+
+
 def format_worktree_rows(
     entries, git_dir, show_status=False, color_mode="auto", force_absolute=False
 ):
@@ -30,53 +52,110 @@ def format_worktree_rows(
     [markers:2] [branch:var]  [head:10]  [path:var]
     """
     # Decide color enablement (stderr TTY + NO_COLOR)
+    term_width, stderr_isatty, color_allowed = _terminal()
     enable_color = False
     if color_mode == ColorMode.ALWAYS:
         enable_color = True
     elif color_mode == ColorMode.AUTO:
-        enable_color = sys.stderr.isatty() and (os.environ.get("NO_COLOR") is None)
-
-    # ANSI codes
-    BOLD = "\033[1m" if enable_color else ""
-    DIM = "\033[2m" if enable_color else ""
-    RED = "\033[31m" if enable_color else ""
-    YELLOW = "\033[33m" if enable_color else ""
-    MAGENTA = "\033[35m" if enable_color else ""
-    RESET = "\033[0m" if enable_color else ""
-
-    # Compute status (!) lazily per worktree if requested
-    def is_dirty(path):
-        if not show_status:
-            return False
-        try:
-            r = run_git_in_worktree(["status", "--porcelain", "-uno"], path)
-            return bool(r.stdout.strip())
-        except subprocess.CalledProcessError:
-            return False
+        enable_color = stderr_isatty and color_allowed
+
+    # ANSI templates, built once; the row loop only does .format()/translate
+    if enable_color:
+        RESET = "\033[0m"
+        branch_tmpl = "\033[1m{}" + RESET  # bold
+        path_tmpl = "\033[2m{}" + RESET  # dim
+        marker_table = str.maketrans(
+            {
+                "!": "\033[31m!" + RESET,  # red
+                "L": "\033[33mL" + RESET,  # yellow
+                "P": "\033[35mP" + RESET,  # magenta
+            }
+        )
+    else:
+        branch_tmpl = path_tmpl = "{}"
+        marker_table = None
+
+    # Resolve everything that is identical for every row once up front;
+    # abspath/cwd lookups are surprisingly expensive to repeat per row.
+    cwd_abs = os.path.abspath(os.getcwd())
+    main_path = get_main_worktree_path(git_dir)
+    main_abs = os.path.abspath(main_path) if main_path else None
+    base_abs = os.path.abspath(get_worktree_base(git_dir))
+    base_parent = os.path.dirname(base_abs)
+
+    _current_flags = {}
+
+    def is_current(path):
+        # Checked up to three times per row (sort key, marker, color)
+        flag = _current_flags.get(path)
+        if flag is None:
+            p = os.path.abspath(path)
+            flag = cwd_abs == p or cwd_abs.startswith(p + os.sep)
+            _current_flags[path] = flag
+        return flag
+
+    def display_path(path):
+        # Inlined rel_display_path using the precomputed main/base paths
+        p = os.path.abspath(path)
+        if force_absolute:
+            return p
+        if main_abs and p == main_abs:
+            return p
+        if p.startswith(base_abs + os.sep):
+            return os.path.relpath(p, base_parent)
+        return p
 
     # Sorting: current first, main second, others by branch (case-insensitive)
     def sort_key(e):
-        current = is_path_current_worktree(e["path"])
+        current = is_current(e["path"])
         main = e.get("is_main", False)
         key_branch = (e.get("branch") or "").lower()
         return (0 if current else (1 if main else 2), key_branch)
 
     entries_sorted = sorted(entries, key=sort_key)
 
+    # Compute status (!) per worktree if requested. Each probe spawns a git
+    # subprocess, so run them concurrently (the subprocess wait releases the
+    # GIL) rather than serially per row.
+    def _dirty_probe(path):
+        try:
+            r = run_git_in_worktree(["status", "--porcelain", "-uno"], path)
+            return bool(r.stdout.strip())
+        except subprocess.CalledProcessError:
+            return False
+
+    dirty_map = {}
+    if show_status and entries_sorted:
+        paths = [e["path"] for e in entries_sorted]
+        with ThreadPoolExecutor(max_workers=min(16, len(paths))) as executor:
+            dirty_map = dict(zip(paths, executor.map(_dirty_probe, paths)))
+
     # Precompute field sizes
-    term_width = shutil.get_terminal_size(fallback=(80, 24)).columns
     head_width = 10
     sep = "  "
     marker_width = 2
     branch_names = [(e.get("branch") or "") for e in entries_sorted]
     max_branch = min(max([len(b) for b in branch_names] + [0]), 40)
 
+    # Column widths are the same for every row; compute them once
+    fixed = marker_width + len(sep) + head_width + len(sep)
+    avail = max(term_width - fixed, 20)
+    branch_width = min(max_branch, avail // 2)
+    path_width = max(avail - branch_width - len(sep), 10)
+
+    def trunc(s, w):
+        # Only called when s overflows w; pad-and-fit cases use the
+        # C-level f-string width specifier instead.
+        if w <= 1:
+            return s[:w]
+        return s[: w - 1] + "…"
+
     # Build lines
     lines = []
     for e in entries_sorted:
         markers = []
 
-        if is_path_current_worktree(e["path"]):
+        if is_current(e["path"]):
             markers.append("•")
         else:
             markers.append(" ")
@@ -90,7 +169,7 @@ def format_worktree_rows(
         else:
             markers.append(" ")
 
-        dirty = is_dirty(e["path"])
+        dirty = dirty_map.get(e["path"], False)
         if dirty:
             markers[-1] = "!"
 
@@ -98,40 +177,27 @@ def format_worktree_rows(
 
         branch = e.get("branch") or ""
         head = e.get("head") or ""
-        path = rel_display_path(e["path"], git_dir, force_absolute)
-
-        # Truncation to fit terminal
-        fixed = marker_width + len(sep) + head_width + len(sep)
-        avail = max(term_width - fixed, 20)
-        branch_width = min(max_branch, avail // 2)
-        path_width = max(avail - branch_width - len(sep), 10)
-
-        def trunc(s, w):
-            if len(s) <= w:
-                return s.ljust(w)
-            if w <= 1:
-                return s[:w]
-            return s[: max(0, w - 1)] + "…"
-
-        # Truncate BEFORE applying colors
-        branch_cell = trunc(branch, branch_width)
-        head_cell = head.ljust(head_width)[:head_width]
-        path_cell = trunc(path, path_width)
+        path = display_path(e["path"])
 
-        # Apply colors AFTER truncation
-        if enable_color and is_path_current_worktree(e["path"]):
-            branch_cell = f"{BOLD}{branch_cell}{RESET}"
-        if enable_color:
-            path_cell = f"{DIM}{path_cell}{RESET}"
+        # Truncate BEFORE applying colors; the format specs truncate and
+        # pad in one C call for the common fits case
+        if len(branch) <= branch_width:
+            branch_cell = f"{branch:<{branch_width}}"
+        else:
+            branch_cell = trunc(branch, branch_width)
+        head_cell = f"{head:<{head_width}.{head_width}}"
+        if len(path) <= path_width:
+            path_cell = f"{path:<{path_width}}"
+        else:
+            path_cell = trunc(path, path_width)
 
-        # Colorize markers
+        # Apply colors AFTER truncation
         if enable_color:
-            if "!" in marker_str:
-                marker_str = marker_str.replace("!", f"{RED}!{RESET}")
-            if "L" in marker_str:
-                marker_str = marker_str.replace("L", f"{YELLOW}L{RESET}")
-            if "P" in marker_str:
-                marker_str = marker_str.replace("P", f"{MAGENTA}P{RESET}")
+            if is_current(e["path"]):
+                branch_cell = branch_tmpl.format(branch_cell)
+            path_cell = path_tmpl.format(path_cell)
+            # Single-pass marker colorization (the markers are 2 chars)
+            marker_str = marker_str.translate(marker_table)
 
         line = f"{marker_str}{sep}{branch_cell}{sep}{head_cell}{sep}{path_cell}"
         lines.append(line.rstrip())
@@ -164,15 +230,21 @@ def list_worktrees(
         # Raw mode (legacy): delegate to git and print to stderr
         if raw:
             try:
-                res = run_git_quiet(["worktree", "list"], git_dir)
-                if res.stdout:
-                    print(res.stdout, file=sys.stderr, end="")
+                out = _worktree_list_raw(git_dir)
+                if out:
+                    print(out, file=sys.stderr, end="")
             except subprocess.CalledProcessError as e:
                 print(f"Error listing worktrees: {e}", file=sys.stderr)
                 sys.exit(1)
             return
 
         # Pretty mode path
+        # Parse porcelain entries once (include main); both rendering and
+        # the reconciliation warnings run off the same parse.
+        entries = parse_worktree_porcelain(git_dir, include_main=True)
+        if entries is None:
+            entries = parse_worktree_legacy(git_dir, include_main=True)
+
         # Collect warnings for summary
         warnings = [] if not no_warn else None
         # Check integrity by invoking the existing reconciliation
@@ -180,13 +252,10 @@ def list_worktrees(
             git_dir,
             include_main=False,
             warnings=warnings if warnings is not None else [],
+            reconcile=True,
+            entries=entries,
         )
 
-        # Parse porcelain entries (include main)
-        entries = parse_worktree_porcelain(git_dir, include_main=True)
-        if entries is None:
-            entries = parse_worktree_legacy(git_dir, include_main=True)
-
         if not entries:
             print("No worktrees found", file=sys.stderr)
             if warnings is not None and verbose and warnings:
@@ -226,6 +295,44 @@ def list_worktrees(
         return
 
 
+def _worktrees_state_token(git_dir):
+    """Cheap fingerprint of $GIT_DIR/worktrees for cache invalidation.
+
+    Combines the directory's own mtime (add/remove), the per-worktree
+    HEAD mtimes (a checkout inside a worktree changes HEAD but not the
+    parent directory), and the entry count. A handful of stats versus a
+    git spawn.
+    """
+    wt_dir = os.path.join(git_dir, "worktrees")
+    try:
+        st = os.stat(wt_dir)
+    except OSError:
+        return "none"
+    newest = st.st_mtime_ns
+    count = 0
+    try:
+        with os.scandir(wt_dir) as it:
+            for entry in it:
+                count += 1
+                try:
+                    head_st = os.stat(entry.path + os.sep + "HEAD")
+                except OSError:
+                    continue
+                if head_st.st_mtime_ns > newest:
+                    newest = head_st.st_mtime_ns
+    except OSError:
+        pass
+    return f"{newest}:{count}"
+
+
+def _completion_cache_path(git_dir):
+    import hashlib
+
+    digest = hashlib.sha1(os.path.abspath(git_dir).encode()).hexdigest()[:16]
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "gwt", f"worktrees-{digest}.json")
+
+
 def list_all_branches(git_dir, mode="all", annotate=None):
     """List branches for tab completion.
 
@@ -233,19 +340,42 @@ def list_all_branches(git_dir, mode="all", annotate=None):
         mode: "all", "local", "worktrees"
         annotate: None | "bash" | "fish"
     """
-    branches = set()
-
-    # Collect worktree branches (exclude main for worktrees mode)
-    if mode in ["all", "worktrees"]:
-        include_main_wt = mode == "all"
-        worktrees = get_worktree_list(
-            git_dir, include_main=include_main_wt, warnings=[]
+    # Plain worktrees mode (the per-keystroke completion case) is served
+    # from a small disk cache when the repo's worktree state is unchanged,
+    # skipping the git spawn entirely. Other modes include local/remote
+    # refs, whose invalidation cannot be tracked this cheaply.
+    if mode == "worktrees" and annotate is None:
+        import json
+
+        token = _worktrees_state_token(git_dir)
+        cache_path = _completion_cache_path(git_dir)
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("token") == token:
+                sys.stdout.writelines(b + "\n" for b in cached["branches"])
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        wt_branches = sorted(
+            e["branch"]
+            for e in parse_worktree_porcelain(git_dir, include_main=True) or []
+            if e["branch"] and not e["detached"] and not e.get("is_main")
         )
-        wt_branches = []
-        for wt in worktrees:
-            if wt["branch"]:
-                branches.add(wt["branch"])
-                wt_branches.append(wt["branch"])
+        sys.stdout.writelines(b + "\n" for b in wt_branches)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"token": token, "branches": wt_branches}, f)
+        except OSError:
+            pass
+        return
+    # One porcelain scan feeds both branch collection and the
+    # categorization below; don't list worktrees a second time.
+    entries = parse_worktree_porcelain(git_dir, include_main=True) or []
+    worktree_branches = {
+        e["branch"] for e in entries if e["branch"] and not e["detached"]
+    }
 
     # Helper function to print branch with annotation
     def print_branch(b, kind):
@@ -273,67 +403,75 @@ def list_all_branches(git_dir, mode="all", annotate=None):
             print(b)
 
     if mode == "worktrees":
-        # Only print worktree branch names (excluding main)
-        for b in sorted(wt_branches):
-            print_branch(b, "worktree")
+        # Only worktree branch names (excluding main); nothing below is
+        # computed on this path
+        wt_branches = sorted(
+            e["branch"]
+            for e in entries
+            if e["branch"] and not e["detached"] and not e.get("is_main")
+        )
+        if annotate is None:
+            # One buffered write instead of a print call (and stdio lock
+            # acquisition) per branch
+            sys.stdout.writelines(b + "\n" for b in wt_branches)
+        else:
+            for b in wt_branches:
+                print_branch(b, "worktree")
         return
 
-    # Add local branches
-    if mode in ["all", "local"]:
-        try:
-            result = run_git_command(
-                ["for-each-ref", "--format=%(refname:short)", "refs/heads/"], git_dir
-            )
-            for branch in result.stdout.strip().split('\n'):
-                if branch:
-                    branches.add(branch)
-        except Exception:
-            pass
-
-    # Add remote branches (without remote prefix for completion)
-    if mode == "all":
-        try:
-            result = run_git_command(
-                ["for-each-ref", "--format=%(refname:short)", "refs/remotes/"], git_dir
-            )
-            for ref in result.stdout.strip().split('\n'):
-                if ref and '/' in ref:
-                    # Extract branch name from remote/branch
-                    branch = ref.split('/', 1)[1]
-                    branches.add(branch)
-        except Exception:
-            pass
-
-    # Get branch categories for proper ordering (include main for mode="all")
-    worktree_branches = {
-        wt["branch"]
-        for wt in get_worktree_list(git_dir, include_main=True, warnings=[])
-        if wt.get("branch")
-    }
-
-    # Get local branches
+    # Bucket each ref as it streams by, with a single for-each-ref spawn
+    # for local (and in "all" mode remote) refs. for-each-ref emits
+    # refs/heads/ before refs/remotes/ (output is sorted by refname), so
+    # the local set is complete by the time remote refs are classified.
     local_branches = set()
+    worktree_bucket = []
+    local_bucket = []
+    remote_bucket = []
+    remote_seen = set()
+    ref_paths = ["refs/heads/"]
+    if mode == "all":
+        ref_paths.append("refs/remotes/")
     try:
-        result = run_git_command(
-            ["for-each-ref", "--format=%(refname:short)", "refs/heads/"], git_dir
-        )
-        for branch in result.stdout.strip().split('\n'):
-            if branch:
+        for ref in run_git_command_iter(
+            ["for-each-ref", "--format=%(refname)", *ref_paths], git_dir
+        ):
+            if ref.startswith("refs/heads/"):
+                branch = ref[len("refs/heads/") :]
                 local_branches.add(branch)
+                if branch in worktree_branches:
+                    worktree_bucket.append(branch)
+                else:
+                    local_bucket.append(branch)
+            elif ref.startswith("refs/remotes/"):
+                # Strip refs/remotes/<remote>/; skip the symbolic HEAD ref.
+                # partition scans once where `in` + split would scan twice
+                _remote, sep, branch = ref[len("refs/remotes/") :].partition('/')
+                if not sep:
+                    continue
+                # Most remote branches shadow a local or worktree branch;
+                # drop them before any bookkeeping happens
+                if (
+                    branch == "HEAD"
+                    or branch in local_branches
+                    or branch in worktree_branches
+                    or branch in remote_seen
+                ):
+                    continue
+                remote_seen.add(branch)
+                remote_bucket.append(branch)
     except Exception:
         pass
 
-    # Categorize branches
-    worktree_list = sorted([b for b in branches if b in worktree_branches])
-    local_no_worktree_list = sorted(
-        [b for b in branches if b in local_branches and b not in worktree_branches]
-    )
-    remote_only_list = sorted([b for b in branches if b not in local_branches])
+    if mode == "all":
+        # Worktree branches whose local ref is gone still list first
+        for branch in worktree_branches:
+            if branch not in local_branches:
+                worktree_bucket.append(branch)
 
     # Output in order: worktrees, local branches, remote branches
-    for branch in worktree_list:
+    for branch in sorted(worktree_bucket):
         print_branch(branch, "worktree")
-    for branch in local_no_worktree_list:
+    for branch in sorted(local_bucket):
         print_branch(branch, "local")
-    for branch in remote_only_list:
+    for branch in sorted(remote_bucket):
         print_branch(branch, "remote")
@@ -1,12 +1,53 @@
 # gwtlib/git_ops.py
+import functools
+import os
 import subprocess
 import sys
 
 
-def run_git_command(cmd_args, git_dir, capture=True):
-    """Execute git commands with specified git directory."""
-    cmd = ["git", f"--git-dir={git_dir}"] + cmd_args
-    if capture:
+@functools.lru_cache(maxsize=4)
+def _git_dir_arg(git_dir):
+    """The --git-dir=<path> argv token, built once per git_dir."""
+    return f"--git-dir={git_dir}"
+
+
+def _spawn_git(cmd, stdout_fd=None):
+    """Spawn git without subprocess's Popen machinery and wait for it.
+
+    posix_spawnp skips the fork_exec FD-closing loop and Popen bookkeeping
+    that subprocess.run pays even when no pipes are wanted. stdout_fd, if
+    given, is dup2'd over the child's stdout. Raises CalledProcessError on
+    nonzero exit; returns a CompletedProcess for caller compatibility.
+    """
+    file_actions = []
+    if stdout_fd is not None:
+        file_actions.append((os.POSIX_SPAWN_DUP2, stdout_fd, 1))
+        file_actions.append((os.POSIX_SPAWN_DUP2, stdout_fd, 2))
+    pid = os.posix_spawnp(cmd[0], cmd, os.environ, file_actions=file_actions)
+    _, status = os.waitpid(pid, 0)
+    returncode = os.waitstatus_to_exitcode(status)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    return subprocess.CompletedProcess(cmd, 0)
+
+
+def run_git_command(cmd_args, git_dir, capture=True, stream_to_stderr=False):
+    """Execute git commands with specified git directory.
+
+    With stream_to_stderr=True the child writes directly to our stderr
+    (stdout included, so informational git output never pollutes the stdout
+    cd-protocol) instead of being buffered through Python and re-printed.
+    """
+    cmd = ["git", _git_dir_arg(git_dir), *cmd_args]
+    if stream_to_stderr:
+        try:
+            stderr_fd = sys.stderr.fileno()
+        except (AttributeError, OSError, ValueError):
+            stderr_fd = None  # stderr replaced (e.g. under test capture)
+        if stderr_fd is not None:
+            sys.stderr.flush()
+            return _spawn_git(cmd, stdout_fd=stderr_fd)
+    if capture or stream_to_stderr:
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
         if result.stdout:
             print(result.stdout, file=sys.stderr, end="")
@@ -14,13 +55,36 @@ def run_git_command(cmd_args, git_dir, capture=True):
             print(result.stderr, file=sys.stderr, end="")
         return result
     else:
-        return subprocess.run(cmd, check=True)
+        # Child inherits our stdio directly
+        return _spawn_git(cmd)
+
+
+def run_git_command_iter(cmd_args, git_dir):
+    """Yield stdout lines (newline-stripped) from a git command as they arrive.
+
+    For line-oriented output (for-each-ref over many refs) this avoids
+    materializing the whole stdout string and its split list. Raises
+    CalledProcessError on nonzero exit, like the capture helpers.
+    """
+    cmd = ["git", _git_dir_arg(git_dir), *cmd_args]
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    try:
+        assert proc.stdout is not None
+        for ln in proc.stdout:
+            yield ln.rstrip("\n")
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
 
 
 def run_git_quiet(cmd_args, git_dir):
     """Like run_git_command but never prints; returns CompletedProcess."""
     return subprocess.run(
-        ["git", f"--git-dir={git_dir}"] + cmd_args,
+        ["git", _git_dir_arg(git_dir), *cmd_args],
         check=True,
         capture_output=True,
         text=True,
@@ -31,22 +95,22 @@ def run_git_in_worktree(cmd_args, worktree_path, capture=True):
     """For commands that must run with -C path (e.g., git -C path status)."""
     if capture:
         return subprocess.run(
-            ["git", "-C", worktree_path] + cmd_args,
+            ["git", "-C", worktree_path, *cmd_args],
             check=True,
             capture_output=True,
             text=True,
         )
-    return subprocess.run(["git", "-C", worktree_path] + cmd_args, check=True)
+    return subprocess.run(["git", "-C", worktree_path, *cmd_args], check=True)
 
 
 def run_git_simple(cmd_args, cwd=None, capture=True):
     """For commands like auto-detect that don't need --git-dir."""
     if capture:
         return subprocess.run(
-            ["git"] + cmd_args,
+            ["git", *cmd_args],
             cwd=cwd,
             check=True,
             capture_output=True,
             text=True,
         )
-    return subprocess.run(["git"] + cmd_args, cwd=cwd, check=True)
+    return subprocess.run(["git", *cmd_args], cwd=cwd, check=True)
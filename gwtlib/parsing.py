@@ -1,12 +1,69 @@
 # gwtlib/parsing.py
+import functools
 import os
+import stat
 import subprocess
 import sys
 
-from gwtlib.git_ops import run_git_in_worktree, run_git_quiet
+from gwtlib.git_ops import run_git_quiet
 from gwtlib.paths import get_worktree_base
 
 
+@functools.lru_cache(maxsize=4)
+def _worktree_list_raw(git_dir):
+    """Raw `git worktree list` stdout, cached per git_dir.
+
+    Several code paths need this listing within a single invocation; caching
+    it avoids spawning git more than once. Callers that mutate worktrees must
+    call invalidate_worktree_cache() afterwards.
+    """
+    return run_git_quiet(["worktree", "list"], git_dir).stdout
+
+
+@functools.lru_cache(maxsize=4)
+def _worktree_porcelain_raw(git_dir):
+    """Raw `git worktree list --porcelain` stdout, cached per git_dir."""
+    return run_git_quiet(["worktree", "list", "--porcelain"], git_dir).stdout
+
+
+def invalidate_worktree_cache():
+    """Drop cached worktree listings after a worktree add/remove."""
+    _worktree_list_raw.cache_clear()
+    _worktree_porcelain_raw.cache_clear()
+
+
+def _p_head(block, rest):
+    block["head"] = rest.strip()
+
+
+def _p_branch(block, rest):
+    ref = rest.strip()
+    if ref == "(detached)":
+        block["branch"] = "(detached)"
+    elif ref.startswith("refs/heads/"):
+        block["branch"] = ref[len("refs/heads/") :]
+    else:
+        block["branch"] = ref  # fallback
+
+
+def _p_locked(block, rest):
+    block["locked"] = True
+
+
+def _p_prunable(block, rest):
+    block["prunable"] = True
+
+
+# One dict lookup per line instead of a startswith() cascade; "worktree"
+# lines are handled inline since they delimit blocks.
+_PORCELAIN_KEYS = {
+    "HEAD": _p_head,
+    "branch": _p_branch,
+    "locked": _p_locked,
+    "prunable": _p_prunable,
+}
+
+
 def parse_worktree_porcelain(git_dir, include_main=True):
     """
     Parse `git worktree list --porcelain`. Return a list of dict entries:
@@ -22,11 +79,11 @@ def parse_worktree_porcelain(git_dir, include_main=True):
     Returns None if porcelain is unavailable or parsing fails (caller should fallback).
     """
     try:
-        res = run_git_quiet(["worktree", "list", "--porcelain"], git_dir)
+        raw = _worktree_porcelain_raw(git_dir)
     except subprocess.CalledProcessError:
         return None
 
-    lines = res.stdout.splitlines()
+    lines = raw.splitlines()
     if not lines:
         return []
 
@@ -52,32 +109,24 @@ def parse_worktree_porcelain(git_dir, include_main=True):
         # Shorten head
         if block["head"]:
             block["head"] = block["head"][:10]
-        entries.append(block.copy())
+        # Blocks are appended as-is; the loop starts a fresh dict for the
+        # next block, so no defensive copy is needed.
+        entries.append(block)
 
     for ln in lines:
         if not ln.strip():
             continue
-        if ln.startswith("worktree "):
+        key, _, rest = ln.partition(" ")
+        if key == "worktree":
             # Start of a new block
             if "path" in block:
                 push_block()
                 block = {}
-            block["path"] = ln.split(" ", 1)[1].strip()
-        elif ln.startswith("HEAD "):
-            block["head"] = ln.split(" ", 1)[1].strip()
-        elif ln.startswith("branch "):
-            ref = ln.split(" ", 1)[1].strip()
-            if ref == "(detached)":
-                block["branch"] = "(detached)"
-            elif ref.startswith("refs/heads/"):
-                block["branch"] = ref[len("refs/heads/") :]
-            else:
-                block["branch"] = ref  # fallback
-        elif ln.startswith("locked"):
-            block["locked"] = True
-        elif ln.startswith("prunable"):
-            block["prunable"] = True
-        # ignore other keys
+            block["path"] = rest.strip()
+            continue
+        handler = _PORCELAIN_KEYS.get(key)
+        if handler:
+            handler(block, rest)
 
     if "path" in block:
         push_block()
@@ -94,18 +143,23 @@ def parse_worktree_legacy(git_dir, include_main=True):
     Returns entries similar to parse_worktree_porcelain (without locked/prunable).
     """
     try:
-        res = run_git_quiet(["worktree", "list"], git_dir)
+        raw = _worktree_list_raw(git_dir)
     except subprocess.CalledProcessError:
         return []
 
     entries = []
-    lines = res.stdout.splitlines()
+    lines = raw.splitlines()
     for i, line in enumerate(lines):
         parts = line.split()
         if len(parts) >= 1:
             path = parts[0]
             branch = None
-            head = ""  # We'll try to fill short SHA per worktree below
+            # The listing already shows an abbreviated SHA; no need for a
+            # per-worktree rev-parse subprocess. Bare/detached annotations
+            # like "(bare)" occupy the same column and are not heads.
+            head = ""
+            if len(parts) >= 2 and not parts[1].startswith("("):
+                head = parts[1]
             if len(parts) >= 3:
                 branch_info = parts[2].strip("[]")
                 if branch_info == "(detached)" or branch_info.startswith("(HEAD"):
@@ -116,13 +170,6 @@ def parse_worktree_legacy(git_dir, include_main=True):
             if i == 0 and not include_main:
                 continue
 
-            # Attempt to get short SHA for each path (best-effort)
-            try:
-                sha_res = run_git_in_worktree(["rev-parse", "--short=10", "HEAD"], path)
-                head = sha_res.stdout.strip()
-            except subprocess.CalledProcessError:
-                head = ""
-
             entries.append(
                 {
                     "path": path,
@@ -138,39 +185,25 @@ def parse_worktree_legacy(git_dir, include_main=True):
 
 
 def get_git_worktrees(git_dir, include_main=False):
-    """Get worktrees as reported by git worktree list command.
+    """Get worktrees as a branch->path dict.
 
-    Returns a dict mapping branch names to their paths.
+    A thin projection over parse_worktree_porcelain, which is the single
+    source of truth for worktree parsing.
 
     Args:
         git_dir: Path to git directory
         include_main: If True, include the main worktree in results
     """
-    git_worktrees = {}
-    try:
-        result = run_git_quiet(["worktree", "list"], git_dir)
-
-        lines = result.stdout.splitlines()
-        for i, line in enumerate(lines):
-            parts = line.split()
-            if len(parts) >= 3:
-                path = parts[0]
-                branch_info = parts[2]
-                # Extract branch name from [branch] format
-                branch = branch_info.strip("[]")
-
-                # Skip the first entry - it's the main working tree
-                if i == 0 and not include_main:
-                    continue
-
-                # Skip detached HEAD worktrees
-                if branch != "(detached)" and not branch.startswith("(HEAD"):
-                    git_worktrees[branch] = path
-
-        return git_worktrees
-    except subprocess.CalledProcessError as e:
-        print(f"Error listing git worktrees: {e}", file=sys.stderr)
+    entries = parse_worktree_porcelain(git_dir, include_main=include_main)
+    if entries is None:
+        print("Error listing git worktrees", file=sys.stderr)
         sys.exit(1)
+    # Skip detached HEAD worktrees; they have no branch to key on
+    return {
+        e["branch"]: e["path"]
+        for e in entries
+        if e["branch"] and not e["detached"]
+    }
 
 
 def get_directory_worktrees(git_dir):
@@ -185,16 +218,24 @@ def get_directory_worktrees(git_dir):
     if not os.path.isdir(worktree_base):
         return dir_worktrees
 
-    # Look for subdirectories in the worktree base directory
+    # Look for subdirectories in the worktree base directory. scandir gives
+    # us the entry type from the directory read itself, so only the .git
+    # probe costs an extra syscall (one lstat covers both the dir and file
+    # forms a worktree's .git can take).
+    # Plain concatenation with a precomputed suffix beats os.path.join's
+    # separator/fspath checks inside the loop
+    git_suffix = os.sep + ".git"
     try:
-        for entry in os.listdir(worktree_base):
-            path = os.path.join(worktree_base, entry)
-            if os.path.isdir(path):
-                # Check if it looks like a git worktree
-                if os.path.isdir(os.path.join(path, ".git")) or os.path.isfile(
-                    os.path.join(path, ".git")
-                ):
-                    dir_worktrees[entry] = path
+        with os.scandir(worktree_base) as it:
+            for entry in it:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    st = os.lstat(entry.path + git_suffix)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(st.st_mode) or stat.S_ISREG(st.st_mode):
+                    dir_worktrees[entry.name] = entry.path
 
         return dir_worktrees
     except OSError as e:
@@ -202,14 +243,21 @@ def get_directory_worktrees(git_dir):
         return dir_worktrees
 
 
-def get_worktree_list(git_dir, include_main=False, warnings=None):
-    """Get a list of all worktrees for the repository, comparing git command output
-    with directory examination.
+def get_worktree_list(
+    git_dir, include_main=False, warnings=None, reconcile=False, entries=None
+):
+    """Get a list of all worktrees for the repository.
 
     Args:
         git_dir: Path to git directory
         include_main: If True, include the main worktree in results
         warnings: If provided, append warning strings instead of printing them
+        reconcile: If True, also scan the worktree base directory and report
+            discrepancies against git's view. Hot paths (switch, remove, tab
+            completion) skip the scan; the pretty list opts in.
+        entries: Already-parsed porcelain/legacy entries to reuse; callers
+            that have parsed the listing for rendering pass it here so the
+            parse happens once per invocation.
 
     Returns a list of dicts with 'path' and 'branch' keys.
     """
@@ -220,41 +268,58 @@ def get_worktree_list(git_dir, include_main=False, warnings=None):
         else:
             print(msg, file=sys.stderr)
 
-    # Get worktrees from both sources (already excludes main working tree)
-    git_worktrees = get_git_worktrees(git_dir, include_main=include_main)
+    # Git's view is authoritative (already excludes main working tree)
+    if entries is None:
+        git_worktrees = get_git_worktrees(git_dir, include_main=include_main)
+    else:
+        git_worktrees = {
+            e["branch"]: e["path"]
+            for e in entries
+            if e["branch"]
+            and not e["detached"]
+            and (include_main or not e.get("is_main"))
+        }
+    if not reconcile:
+        return [
+            {"path": path, "branch": branch}
+            for branch, path in git_worktrees.items()
+        ]
     dir_worktrees = get_directory_worktrees(git_dir)
 
-    # Combine results, reporting any discrepancies
+    # Combine results, reporting any discrepancies. Normalize the base once
+    # so the per-branch prefix check is a plain string compare that is not
+    # tripped up by trailing slashes.
     worktrees = []
-    all_branches = set(git_worktrees.keys()) | set(dir_worktrees.keys())
+    worktree_base_prefix = os.path.normpath(get_worktree_base(git_dir)) + os.sep
 
-    for branch in all_branches:
-        git_path = git_worktrees.get(branch)
-        dir_path = dir_worktrees.get(branch)
+    # Walk git's view in place, popping matches out of the (freshly built)
+    # directory dict rather than materializing a union set of both key
+    # views; whatever is left over afterwards is directory-only.
+    for branch, git_path in git_worktrees.items():
+        dir_path = dir_worktrees.pop(branch, None)
 
-        if git_path and dir_path:
+        if dir_path is not None:
             # Branch exists in both sources
             if git_path != dir_path:
                 warn(f"Warning: Mismatch for branch '{branch}':")
                 warn(f"  Git reports: {git_path}")
                 warn(f"  Directory shows: {dir_path}")
-
-            # Use the git path as the source of truth
-            worktrees.append({"path": git_path, "branch": branch})
-        elif git_path:
+        else:
             # Branch exists in git but not in directory - only warn if it's
             # supposed to be in the .gwt directory
-            worktree_base = get_worktree_base(git_dir)
-            if git_path.startswith(worktree_base):
+            if os.path.normpath(git_path).startswith(worktree_base_prefix):
                 warn(
                     f"Warning: Branch '{branch}' found by git but not in worktree directory"
                 )
-            worktrees.append({"path": git_path, "branch": branch})
-        elif dir_path:
-            # Branch exists in directory but not reported by git
-            warn(
-                f"Warning: Directory '{branch}' exists in worktree path but not recognized by git"
-            )
-            # Don't add to the list as it's not a valid worktree according to git
+
+        # Use the git path as the source of truth
+        worktrees.append({"path": git_path, "branch": branch})
+
+    for branch in dir_worktrees:
+        # Branch exists in directory but not reported by git; don't add it
+        # to the list as it's not a valid worktree according to git
+        warn(
+            f"Warning: Directory '{branch}' exists in worktree path but not recognized by git"
+        )
 
     return worktrees
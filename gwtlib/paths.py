@@ -1,50 +1,107 @@
 # gwtlib/paths.py
+import functools
 import os
-from pathlib import Path
-from typing import Optional, cast
+from typing import NamedTuple, Optional, cast
 
 
+class RepoInfo(NamedTuple):
+    """Resolved flavor of a git dir, shared by the path helpers."""
+
+    resolved: str  # absolute, symlink-resolved git dir
+    is_dot_git: bool  # True when git_dir is a non-bare repo's .git directory
+    repo_root: Optional[str]  # main worktree path for non-bare repos, else None
+
+
+def _fast_resolve(p: str) -> str:
+    """Resolve a path without a full symlink walk in the common case.
+
+    An absolute, non-symlink path only needs normpath; realpath (which
+    lstats every component) is reserved for relative paths and direct
+    symlinks.
+    """
+    if os.path.isabs(p) and not os.path.islink(p):
+        return os.path.normpath(p)
+    return os.path.realpath(p)
+
+
+@functools.lru_cache(maxsize=4)
+def classify_git_dir(git_dir: str) -> RepoInfo:
+    """Classify git_dir as bare vs a non-bare repo's .git directory.
+
+    Cached so the resolve/stat probes happen once per git_dir per process
+    instead of being re-derived at every call site.
+    """
+    resolved = _fast_resolve(git_dir)
+    if os.path.basename(resolved) == ".git" and os.path.isdir(resolved):
+        return RepoInfo(resolved, True, os.path.dirname(resolved))
+    return RepoInfo(resolved, False, None)
+
+
+@functools.lru_cache(maxsize=8)
 def get_worktree_base(git_dir: str) -> str:
-    """Get the base directory for worktrees, creating it if needed."""
-    git_dir_path = Path(git_dir).resolve()
-    if git_dir_path.name == ".git" and git_dir_path.is_dir():
-        repo_path = git_dir_path.parent
-        worktree_base = str(repo_path) + ".gwt"
-    elif git_dir.endswith(".git"):
-        worktree_base = git_dir[:-4] + ".gwt"
-    else:
-        worktree_base = git_dir.rstrip("/") + ".gwt"
-    if not os.path.exists(worktree_base):
-        os.makedirs(worktree_base, exist_ok=True)
-        readme_path = os.path.join(worktree_base, "README.md")
-        with open(readme_path, "w") as f:
-            f.write(
-                """# Git Worktree Directory
+    """Compute the base directory for worktrees (no filesystem side effects).
+
+    Read paths (listing, display, reconciliation) only need the path string;
+    use ensure_worktree_base() at worktree-creation sites.
+    """
+    info = classify_git_dir(git_dir)
+    if info.is_dot_git:
+        return cast(str, info.repo_root) + ".gwt"
+    # removesuffix tests and strips in one C call; unchanged output means
+    # the suffix wasn't there (bare dir without .git naming)
+    stripped = git_dir.removesuffix(".git")
+    if stripped == git_dir:
+        stripped = git_dir.rstrip("/")
+    return stripped + ".gwt"
+
+
+# Encoded once at import; the creation path writes it via a raw fd
+_README_BYTES = b"""# Git Worktree Directory
 
 This directory contains git worktrees managed by the gwt tool.
 Each subdirectory is a separate worktree for a branch.
 
 For more information, see: https://github.com/username/gwt
 """
-            )
+
+
+def ensure_worktree_base(git_dir: str) -> str:
+    """Get the base directory for worktrees, creating it (with a README) if needed."""
+    worktree_base = get_worktree_base(git_dir)
+    if not os.path.exists(worktree_base):
+        os.makedirs(worktree_base, exist_ok=True)
+        readme_path = os.path.join(worktree_base, "README.md")
+        try:
+            # O_EXCL: only the creator writes the README; raw fd write
+            # skips the TextIOWrapper setup and per-call encode
+            fd = os.open(readme_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            pass
+        else:
+            try:
+                os.write(fd, _README_BYTES)
+            finally:
+                os.close(fd)
     return worktree_base
 
 
 def get_main_worktree_path(git_dir: str) -> Optional[str]:
     """Get the path to the main worktree for non-bare repositories."""
-    git_dir_path = Path(git_dir).resolve()
-    if git_dir_path.name == ".git" and git_dir_path.is_dir():
-        return str(git_dir_path.parent)
-    else:
-        return None
+    return classify_git_dir(git_dir).repo_root
+
 
+def is_path_current_worktree(path: str, cwd_abs: Optional[str] = None) -> bool:
+    """Check if the current directory is inside the given worktree path.
 
-def is_path_current_worktree(path: str) -> bool:
-    """Check if the current directory is inside the given worktree path."""
+    Callers that check many paths can precompute the absolute cwd once and
+    pass it as cwd_abs. Absolute candidates only need a normpath, not the
+    full abspath pipeline.
+    """
     try:
-        cur = os.path.abspath(os.getcwd())
-        p = os.path.abspath(path)
-        return cur == p or cur.startswith(p + os.sep)
+        if cwd_abs is None:
+            cwd_abs = os.path.abspath(os.getcwd())
+        p = os.path.normpath(path) if os.path.isabs(path) else os.path.abspath(path)
+        return cwd_abs == p or cwd_abs.startswith(p + os.sep)
     except Exception:
         return False
 
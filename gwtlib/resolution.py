@@ -1,13 +1,39 @@
 # gwtlib/resolution.py
+import functools
 import os
+import stat
 import subprocess
 from typing import Optional
 
-from gwtlib.config import HAS_TOML, load_config
+from gwtlib.config import has_toml, load_config
 from gwtlib.git_ops import run_git_simple
 from gwtlib.paths import _normalize_repo_path
 
 
+@functools.lru_cache(maxsize=8)
+def _probe_repo_path(path: str) -> Optional[str]:
+    """Normalize a user-supplied repo path and verify it exists on disk.
+
+    Returns the git dir (with .git appended for non-bare checkouts) or None.
+    One stat for the path and one for its .git child cover the whole probe
+    (the isdir/isdir/isdir cascade cost up to three), and the cache means
+    env/config fallbacks pointing at the same path only stat it once per
+    process.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return None
+    dot_git = os.path.join(path, ".git")
+    try:
+        st_git = os.stat(dot_git)
+    except OSError:
+        return path  # bare repo layout
+    return dot_git if stat.S_ISDIR(st_git.st_mode) else path
+
+
 def auto_detect_git_dir(cwd: Optional[str] = None) -> Optional[str]:
     """Return absolute path to the git common dir for current directory, or None if not in a git repo.
     Uses: git rev-parse --git-common-dir
@@ -39,9 +65,6 @@ def get_git_dir_with_source(explicit_git_dir: Optional[str] = None):
     meta contains useful info for error messages.
     """
     meta = {"env": os.environ.get("GWT_GIT_DIR"), "config": None}
-    if HAS_TOML:
-        cfg = load_config()
-        meta["config"] = cfg.get("default_repo")
 
     # 1) Explicit (for list completion only)
     if explicit_git_dir:
@@ -55,22 +78,30 @@ def get_git_dir_with_source(explicit_git_dir: Optional[str] = None):
 
     # 3) Env var
     if meta["env"]:
-        gd_env = _normalize_repo_path(meta["env"])
-        if os.path.isdir(gd_env):
+        gd_env = _probe_repo_path(meta["env"])
+        if gd_env:
             return (gd_env, "env", meta)
         # If invalid, return with source and let caller error out
         return (None, "env_invalid", meta)
 
-    # 4) Config
+    # 4) Config — only now pay the TOML import and parse; invocations
+    # resolved by the earlier sources never touch the config file
+    if has_toml():
+        meta["config"] = load_config().get("default_repo")
     if meta["config"]:
-        gd_cfg = _normalize_repo_path(meta["config"])
-        if os.path.isdir(gd_cfg):
+        gd_cfg = _probe_repo_path(meta["config"])
+        if gd_cfg:
             return (gd_cfg, "config", meta)
         return (None, "config_invalid", meta)
 
     return (None, None, meta)
 
 
+# "not yet computed" sentinel; None is a legitimate resolution result
+_git_dir_cached: object = object()
+_GIT_DIR_UNSET = _git_dir_cached
+
+
 # Backward-compatible wrapper
 def get_git_dir() -> Optional[str]:
     """Get the git directory from either the environment variable or the config file.
@@ -78,8 +109,14 @@ def get_git_dir() -> Optional[str]:
     This is a common function to encapsulate the logic for determining the git dir.
     Automatically appends .git for non-bare repositories.
 
+    The resolution (rev-parse subprocess plus env/config probes) runs once
+    per process; later calls return the cached answer.
+
     Returns:
         The git directory path, or None if not found
     """
-    gd, _, _ = get_git_dir_with_source()
-    return gd
+    global _git_dir_cached
+    if _git_dir_cached is _GIT_DIR_UNSET:
+        gd, _, _ = get_git_dir_with_source()
+        _git_dir_cached = gd
+    return _git_dir_cached  # type: ignore[return-value]
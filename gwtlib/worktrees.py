@@ -1,25 +1,44 @@
 # gwtlib/worktrees.py
 import os
+import shlex
+import stat
 import subprocess
 import sys
-from pathlib import Path
 from typing import Optional
 
 from gwtlib.branches import (
-    branch_exists_locally,
     find_remote_branch,
-    get_main_branch_name,
+    resolve_branch_ref,
 )
 from gwtlib.config import get_repo_config
 from gwtlib.git_ops import run_git_command
-from gwtlib.parsing import get_worktree_list
-from gwtlib.paths import get_main_worktree_path, get_worktree_base
+from gwtlib.parsing import (
+    get_git_worktrees,
+    invalidate_worktree_cache,
+    parse_worktree_porcelain,
+)
+from gwtlib.paths import (
+    classify_git_dir,
+    ensure_worktree_base,
+    get_worktree_base,
+)
+
 
+def create_worktree_for_branch(branch_name, git_dir, worktree_path, branch_flag=None):
+    """Create a worktree for an existing local branch.
 
-def create_worktree_for_branch(branch_name, git_dir, worktree_path):
-    """Create a worktree for an existing local branch."""
+    branch_flag: optional "-b"/"-B" to also create (or force-reset) the
+    branch in the same git invocation instead of a separate \`git branch\`
+    spawn.
+    """
+    if branch_flag:
+        cmd = ["worktree", "add", branch_flag, branch_name, worktree_path]
+    else:
+        cmd = ["worktree", "add", worktree_path, branch_name]
     try:
-        run_git_command(["worktree", "add", worktree_path, branch_name], git_dir)
+        ensure_worktree_base(git_dir)
+        run_git_command(cmd, git_dir, stream_to_stderr=True)
+        invalidate_worktree_cache()
         print(f"Created worktree at {worktree_path}", file=sys.stderr)
         run_post_create_commands(git_dir, worktree_path, branch_name)
         print(f"cd {worktree_path}")
@@ -32,9 +51,13 @@ def create_tracking_worktree(branch_name, git_dir, remote_ref, worktree_path):
     """Create a worktree that tracks a remote branch."""
     try:
         # Create local branch tracking the remote
+        ensure_worktree_base(git_dir)
         run_git_command(
-            ["worktree", "add", "-b", branch_name, worktree_path, remote_ref], git_dir
+            ["worktree", "add", "-b", branch_name, worktree_path, remote_ref],
+            git_dir,
+            stream_to_stderr=True,
         )
+        invalidate_worktree_cache()
         print(f"Branch '{branch_name}' set up to track '{remote_ref}'", file=sys.stderr)
         print(f"Created worktree at {worktree_path}", file=sys.stderr)
         run_post_create_commands(git_dir, worktree_path, branch_name)
@@ -57,28 +80,70 @@ def handle_worktree_error(e, branch_name):
         )
 
 
+# Characters that require a shell to interpret (pipes, redirects, globs,
+# expansions). Plain argv commands bypass /bin/sh entirely.
+_SHELL_CHARS = set("|&;<>$`*?(){}[]\\\"'~\n")
+
+
 def run_post_create_commands(git_dir, worktree_path, branch_name):
-    """Run post-create commands for a worktree."""
+    """Run post-create commands for a worktree.
+
+    A single command with no shell metacharacters is exec'd directly
+    (shlex.split, no /bin/sh), saving a fork and avoiding shell
+    interpretation. Anything else is chained with '&&' into one shell
+    invocation, so a multi-step config still costs one spawn; each step
+    echoes a "Running: ..." marker before it executes and failure still
+    stops the chain. Output streams to stderr rather than buffering, so
+    large build logs don't accumulate in memory and don't interfere with
+    the cd command on stdout.
+    """
     repo_config = get_repo_config(git_dir)
-    if repo_config.get("post_create_commands"):
-        print(f"Running post-create commands for {branch_name}...", file=sys.stderr)
-        current_dir = os.getcwd()
-        try:
-            os.chdir(worktree_path)
-            for cmd in repo_config["post_create_commands"]:
-                print(f"Running: {cmd}", file=sys.stderr)
-                # Redirect stdout to stderr to not interfere with cd command
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-                if result.stdout:
-                    print(result.stdout, file=sys.stderr)
-                if result.stderr:
-                    print(result.stderr, file=sys.stderr)
-                if result.returncode != 0:
-                    raise subprocess.CalledProcessError(result.returncode, cmd)
-        except Exception as e:
-            print(f"Error running post-create commands: {e}", file=sys.stderr)
-        finally:
-            os.chdir(current_dir)
+    commands = repo_config.get("post_create_commands")
+    if not commands:
+        return
+    print(f"Running post-create commands for {branch_name}...", file=sys.stderr)
+
+    try:
+        stderr_fd = sys.stderr.fileno()
+    except (AttributeError, OSError, ValueError):
+        stderr_fd = None
+
+    try:
+        if len(commands) == 1 and not _SHELL_CHARS.intersection(commands[0]):
+            cmd = commands[0]
+            print(f"Running: {cmd}", file=sys.stderr)
+            run_args = {"args": shlex.split(cmd), "shell": False}
+        else:
+            joined = " && ".join(
+                f"(echo Running: {shlex.quote(cmd)}; {cmd})" for cmd in commands
+            )
+            run_args = {"args": joined, "shell": True}
+        if stderr_fd is not None:
+            sys.stderr.flush()
+            result = subprocess.run(
+                run_args["args"],
+                shell=run_args["shell"],
+                stdout=stderr_fd,
+                stderr=stderr_fd,
+                cwd=worktree_path,
+            )
+        else:
+            # No real stderr fd (e.g. captured streams); buffer and reprint
+            result = subprocess.run(
+                run_args["args"],
+                shell=run_args["shell"],
+                capture_output=True,
+                text=True,
+                cwd=worktree_path,
+            )
+            if result.stdout:
+                print(result.stdout, file=sys.stderr)
+            if result.stderr:
+                print(result.stderr, file=sys.stderr)
+        if result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, run_args["args"])
+    except Exception as e:
+        print(f"Error running post-create commands: {e}", file=sys.stderr)
 
 
 def switch_branch(branch_name, git_dir, create=False, force_create=False, guess=True):
@@ -86,48 +151,79 @@ def switch_branch(branch_name, git_dir, create=False, force_create=False, guess=
     worktree_base = get_worktree_base(git_dir)
     worktree_path = os.path.join(worktree_base, branch_name)
 
+    # Fast path: a worktree already sits at the canonical location (one
+    # lstat of its .git marker, covering both the gitfile and directory
+    # forms) — print the cd without spawning git at all
+    try:
+        st = os.lstat(os.path.join(worktree_path, ".git"))
+    except OSError:
+        st = None
+    if st is not None and (stat.S_ISREG(st.st_mode) or stat.S_ISDIR(st.st_mode)):
+        print(f"cd {worktree_path}")
+        return
+
+    # One porcelain scan answers both "is this the main branch" and
+    # "does a worktree already exist" (no directory reconciliation on
+    # this hot path)
+    entries = parse_worktree_porcelain(git_dir, include_main=True) or []
+
     # Special handling for switching to main repo
-    if branch_name == get_main_branch_name(git_dir):
-        main_path = get_main_worktree_path(git_dir)
-        if main_path:
-            print(f"cd {main_path}")
-            return
+    main_entry = next((e for e in entries if e.get("is_main")), None)
+    if main_entry and main_entry.get("branch") == branch_name:
+        print(f"cd {main_entry['path']}")
+        return
 
-    # Check if worktree already exists
-    worktrees = get_worktree_list(git_dir, include_main=True)
-    for wt in worktrees:
-        if wt["branch"] == branch_name:
-            print(f"cd {wt['path']}")
-            return
+    match = next((e for e in entries if e["branch"] == branch_name), None)
+    if match:
+        print(f"cd {match['path']}")
+        return
 
-    # Handle create flags
+    # Handle create flags; worktree add's -b/-B create the branch in the
+    # same git invocation as the worktree
     if force_create:
-        # Force create new branch
-        try:
-            run_git_command(["branch", "-f", branch_name], git_dir)
-        except subprocess.CalledProcessError:
-            run_git_command(["branch", branch_name], git_dir)
-        create_worktree_for_branch(branch_name, git_dir, worktree_path)
+        create_worktree_for_branch(
+            branch_name, git_dir, worktree_path, branch_flag="-B"
+        )
         return
 
     if create:
-        # Create new branch
         try:
-            run_git_command(["branch", branch_name], git_dir)
-            create_worktree_for_branch(branch_name, git_dir, worktree_path)
-            return
-        except subprocess.CalledProcessError:
-            print(f"Error: Branch '{branch_name}' already exists", file=sys.stderr)
-            print("Use -C to force create", file=sys.stderr)
+            ensure_worktree_base(git_dir)
+            # Captured (not streamed) so a failure's stderr can be
+            # inspected: worktree add can also fail for non-branch
+            # reasons (existing target path, locked worktree, disk)
+            run_git_command(
+                ["worktree", "add", "-b", branch_name, worktree_path],
+                git_dir,
+            )
+        except subprocess.CalledProcessError as e:
+            stderr = getattr(e, "stderr", None) or ""
+            needle = f"branch named '{branch_name}' already exists".lower()
+            if needle in stderr.lower():
+                print(f"Error: Branch '{branch_name}' already exists", file=sys.stderr)
+                print("Use -C to force create", file=sys.stderr)
+            else:
+                handle_worktree_error(e, branch_name)
             sys.exit(1)
-
-    # Check if local branch exists
-    if branch_exists_locally(branch_name, git_dir):
-        create_worktree_for_branch(branch_name, git_dir, worktree_path)
+        invalidate_worktree_cache()
+        print(f"Created worktree at {worktree_path}", file=sys.stderr)
+        run_post_create_commands(git_dir, worktree_path, branch_name)
+        print(f"cd {worktree_path}")
         return
 
-    # Check remote branches if guess is enabled
-    if guess:
+    # One for-each-ref scan answers both the local and remote existence
+    # probes (no fetch involved)
+    resolved = resolve_branch_ref(branch_name, git_dir)
+    if resolved:
+        kind, ref = resolved
+        if kind == "local":
+            create_worktree_for_branch(branch_name, git_dir, worktree_path)
+            return
+        if guess:
+            create_tracking_worktree(branch_name, git_dir, ref, worktree_path)
+            return
+    elif guess:
+        # Nothing known locally; fall back to the fetching path
         remote_ref = find_remote_branch(branch_name, git_dir)
         if remote_ref:
             create_tracking_worktree(branch_name, git_dir, remote_ref, worktree_path)
@@ -154,15 +250,9 @@ def switch_branch(branch_name, git_dir, create=False, force_create=False, guess=
 
 def remove_worktree(branch_name: str, git_dir: str) -> None:
     try:
-        # Find the worktree path using our shared function
-        worktrees = get_worktree_list(git_dir)
-
-        # Find the worktree for this branch
-        worktree_path: Optional[str] = None
-        for worktree in worktrees:
-            if worktree["branch"] == branch_name:
-                worktree_path = worktree["path"]
-                break
+        # Branch -> path lookup via the shared dict projection of the
+        # cached porcelain parse
+        worktree_path: Optional[str] = get_git_worktrees(git_dir).get(branch_name)
 
         if not worktree_path:
             print(
@@ -172,21 +262,26 @@ def remove_worktree(branch_name: str, git_dir: str) -> None:
         # Narrow type for static checkers and add runtime safety
         assert worktree_path is not None
 
-        # Check if we're currently in the worktree being removed
-        current_dir = os.getcwd()
-        worktree_abs = os.path.abspath(worktree_path)
-        current_abs = os.path.abspath(current_dir)
+        # Check if we're currently in the worktree being removed. git
+        # reports absolute worktree paths, so a normpath usually suffices;
+        # the cwd is resolved exactly once.
+        current_abs = os.path.abspath(os.getcwd())
+        worktree_abs = (
+            os.path.normpath(worktree_path)
+            if os.path.isabs(worktree_path)
+            else os.path.abspath(worktree_path)
+        )
 
         need_cd = False
         if current_abs.startswith(worktree_abs + os.sep) or current_abs == worktree_abs:
             need_cd = True
             # Determine the safe directory based on repo type
-            git_dir_path = Path(git_dir).resolve()
+            repo_info = classify_git_dir(git_dir)
 
-            if git_dir_path.name == ".git" and git_dir_path.is_dir():
+            if repo_info.is_dot_git:
                 # Non-bare repo: git_dir is /path/to/repo/.git
                 # Safe dir should be the repo itself: /path/to/repo
-                safe_dir = str(git_dir_path.parent)
+                safe_dir = repo_info.repo_root
             else:
                 # Bare repo: git_dir is /path/to/repo.git
                 # Safe dir should be parent of .gwt: /path/to
@@ -197,24 +292,40 @@ def remove_worktree(branch_name: str, git_dir: str) -> None:
                 file=sys.stderr,
             )
 
-        # Remove the worktree (don't capture output as it might prompt the user)
-        run_git_command(["worktree", "remove", worktree_path], git_dir, capture=False)
+        # Ask about the branch up front so a confirmed removal can fuse
+        # both git calls into one spawn. Only prompt on a real terminal:
+        # with piped stdin (scripts, completion) input() would block or
+        # misread, and skipping the prompt keeps the default no-delete
+        # answer. readline() also avoids input()'s readline-module import.
+        if sys.stdin.isatty():
+            sys.stderr.write(
+                f"Do you also want to delete the branch '{branch_name}'? (y/N): "
+            )
+            sys.stderr.flush()
+            confirm = sys.stdin.readline().strip()
+        else:
+            confirm = ""
 
-        # Then remove the branch if the user confirms
-        # Print to stderr and flush to ensure prompt is visible immediately
-        print(
-            f"Do you also want to delete the branch '{branch_name}'? (y/N): ",
-            end="",
-            file=sys.stderr,
-        )
-        sys.stderr.flush()
-        confirm = input()
         if confirm.lower() == "y":
-            # Change to safe directory first if needed, before trying to delete branch
+            # Change to safe directory first if needed, before removing
             if need_cd:
                 os.chdir(safe_dir)
-            run_git_command(["branch", "-D", branch_name], git_dir, capture=False)
+            # One shell spawn runs remove and branch -D back to back
+            # (stdio inherited, as git worktree remove may prompt)
+            gd = shlex.quote(str(git_dir))
+            script = (
+                f"git --git-dir={gd} worktree remove {shlex.quote(worktree_path)}"
+                f" && git --git-dir={gd} branch -D {shlex.quote(branch_name)}"
+            )
+            subprocess.run(["sh", "-c", script], check=True)
+            invalidate_worktree_cache()
             print(f"Branch '{branch_name}' has been deleted")
+        else:
+            # Don't capture output as it might prompt the user
+            run_git_command(
+                ["worktree", "remove", worktree_path], git_dir, capture=False
+            )
+            invalidate_worktree_cache()
 
         print(f"Worktree for '{branch_name}' has been removed")
 
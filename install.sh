@@ -62,6 +62,10 @@ if [ ! -f "$APPDIR/gwt.py" ] || [ ! -d "$APPDIR/gwtlib" ]; then
     exit 1
 fi
 
+# Pre-compile bytecode so the first (cold) invocation doesn't pay the
+# parse/compile step for every module
+python3 -m compileall -q "$APPDIR" 2>/dev/null || true
+
 # Install wrappers to ~/.local/bin
 echo "Installing shell wrappers to $BIN_DIR..."
 cp "$SCRIPT_DIR/gwt.sh" "$BIN_DIR/gwt.sh"
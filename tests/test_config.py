@@ -0,0 +1,29 @@
+import gwtlib.config as config_mod
+
+
+def test_get_repo_config_does_not_persist_defaults(monkeypatch):
+    # A repo absent from the config should get in-memory defaults without
+    # writing anything back to disk
+    saves = []
+    monkeypatch.setattr(config_mod, "save_config", lambda cfg: saves.append(cfg))
+    monkeypatch.setattr(
+        config_mod, "load_config", lambda: {"default_repo": None, "repos": {}}
+    )
+
+    first = config_mod.get_repo_config("/some/repo.git")
+    second = config_mod.get_repo_config("/some/repo.git")
+
+    assert first == {"post_create_commands": []}
+    assert second == {"post_create_commands": []}
+    assert saves == []
+
+
+def test_get_repo_config_returns_configured_entry(monkeypatch):
+    entry = {"post_create_commands": ["echo hi"]}
+    monkeypatch.setattr(
+        config_mod,
+        "load_config",
+        lambda: {"default_repo": None, "repos": {"/some/repo.git": entry}},
+    )
+
+    assert config_mod.get_repo_config("/some/repo.git") == entry
@@ -5,7 +5,7 @@ from pathlib import Path
 import gwt
 
 
-def test_get_worktree_base_nonbare_creates_dir(tmp_path, monkeypatch):
+def test_get_worktree_base_is_pure(tmp_path, monkeypatch):
     repo = tmp_path / "repo"
     repo.mkdir()
     (repo / ".git").mkdir()
@@ -13,6 +13,18 @@ def test_get_worktree_base_nonbare_creates_dir(tmp_path, monkeypatch):
 
     base = gwt.get_worktree_base(git_dir)
     assert base.endswith(".gwt")
+    # Computing the path must not create the directory
+    assert not Path(base).exists()
+
+
+def test_ensure_worktree_base_nonbare_creates_dir(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / ".git").mkdir()
+    git_dir = str(repo / ".git")
+
+    base = gwt.ensure_worktree_base(git_dir)
+    assert base.endswith(".gwt")
     base_path = Path(base)
     assert base_path.exists()
     assert (base_path / "README.md").exists()